@@ -1,24 +1,42 @@
 """
 API routes for the multilingual voice translation application
 """
+import asyncio
+import base64
+import binascii
 import logging
 import os
-import base64
+import stat
 from typing import List
+import orjson
 from fastapi import APIRouter, HTTPException, status, File, UploadFile, Form
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, Response
 from app.models.schemas import (
     TranslationRequest, TranslationResponse,
+    MultiTranslationRequest, MultiTranslationResponse,
+    AutoTranslationRequest, AutoTranslationResponse,
     VoiceToTextRequest, VoiceToTextResponse,
     TextToSpeechRequest, TextToSpeechResponse,
     LanguageInfo, ErrorResponse
 )
-from app.services.gemini_service import gemini_service
+from app.services.gemini_service import get_gemini_service
 from app.services.speech_service import speech_service
-from app.config import settings
+from app.config import settings, supported_language_codes
 
 logger = logging.getLogger(__name__)
 
+# Chunk size for reading uploaded files
+UPLOAD_CHUNK_SIZE = 1 << 20
+
+# Directory holding generated speech files
+AUDIO_DIR = os.path.abspath(speech_service.audio_output_dir)
+
+# The supported languages table is static, so the /languages body is serialized once
+SUPPORTED_LANGUAGES_JSON = orjson.dumps([
+    LanguageInfo(code=code, name=name).model_dump()
+    for code, name in settings.supported_languages.items()
+])
+
 # Create API router
 router = APIRouter(prefix="/api/v1", tags=["translation"])
 
@@ -41,14 +59,12 @@ async def health_check():
 async def get_supported_languages():
     """Get list of all supported languages"""
     try:
-        languages = []
-        for code, name in settings.supported_languages.items():
-            languages.append(LanguageInfo(code=code, name=name))
-
-        return languages
+        # Returning a Response directly skips response_model validation and
+        # serialization; response_model still documents the payload
+        return Response(content=SUPPORTED_LANGUAGES_JSON, media_type="application/json")
 
     except Exception as e:
-        logger.error(f"Failed to get supported languages: {str(e)}")
+        logger.error("Failed to get supported languages: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to retrieve supported languages"
@@ -64,20 +80,20 @@ async def translate_text(request: TranslationRequest):
     """Translate text from source language to target language"""
     try:
         # Validate language codes
-        if request.source_language not in settings.supported_languages:
+        if request.source_language not in supported_language_codes:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"Unsupported source language: {request.source_language}"
             )
 
-        if request.target_language not in settings.supported_languages:
+        if request.target_language not in supported_language_codes:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"Unsupported target language: {request.target_language}"
             )
 
         # Perform translation
-        translated_text, confidence = await gemini_service.translate_text(
+        translated_text, confidence = await get_gemini_service().translate_text(
             text=request.text,
             source_language=request.source_language,
             target_language=request.target_language
@@ -94,13 +110,109 @@ async def translate_text(request: TranslationRequest):
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Translation failed: {str(e)}")
+        logger.error("Translation failed: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Translation failed: {str(e)}"
         )
 
 
+@router.post(
+    "/translate-multi",
+    response_model=MultiTranslationResponse,
+    summary="Translate text into several target languages"
+)
+async def translate_multi(request: MultiTranslationRequest):
+    """Translate text from the source language into each of the target languages"""
+    try:
+        # Validate language codes
+        if request.source_language not in supported_language_codes:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unsupported source language: {request.source_language}"
+            )
+
+        for target_language in request.target_languages:
+            if target_language not in supported_language_codes:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Unsupported target language: {target_language}"
+                )
+
+        # Translate into all targets concurrently, each target once
+        target_languages = list(dict.fromkeys(request.target_languages))
+        gemini_service = get_gemini_service()
+        results = await asyncio.gather(*(
+            gemini_service.translate_text(
+                text=request.text,
+                source_language=request.source_language,
+                target_language=target_language
+            )
+            for target_language in target_languages
+        ))
+
+        return MultiTranslationResponse(
+            original_text=request.text,
+            source_language=request.source_language,
+            translations={
+                target_language: translated_text
+                for target_language, (translated_text, _) in zip(target_languages, results)
+            },
+            confidence_scores={
+                target_language: confidence
+                for target_language, (_, confidence) in zip(target_languages, results)
+            }
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("Multi-target translation failed: %s", e)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Multi-target translation failed: {str(e)}"
+        )
+
+
+@router.post(
+    "/auto-translate",
+    response_model=AutoTranslationResponse,
+    summary="Detect the source language and translate in one step"
+)
+async def auto_translate(request: AutoTranslationRequest):
+    """Detect the language of the text and translate it with a single Gemini call"""
+    try:
+        # Validate language code
+        if request.target_language not in supported_language_codes:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unsupported target language: {request.target_language}"
+            )
+
+        # Perform detection and translation
+        source_language, translated_text, confidence = await get_gemini_service().detect_and_translate(
+            text=request.text,
+            target_language=request.target_language
+        )
+
+        return AutoTranslationResponse(
+            original_text=request.text,
+            translated_text=translated_text,
+            source_language=source_language,
+            target_language=request.target_language,
+            confidence_score=confidence
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("Auto translation failed: %s", e)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Auto translation failed: {str(e)}"
+        )
+
+
 @router.post(
     "/voice-to-text",
     response_model=VoiceToTextResponse,
@@ -110,15 +222,24 @@ async def voice_to_text(request: VoiceToTextRequest):
     """Convert voice audio to text using speech recognition"""
     try:
         # Validate language code
-        if request.language not in settings.supported_languages:
+        if request.language not in supported_language_codes:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"Unsupported language: {request.language}"
             )
 
+        # Decode the audio once and hand the bytes to the recognizer
+        try:
+            audio_bytes = base64.b64decode(request.audio_data, validate=False)
+        except binascii.Error:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Audio data must be base64 encoded"
+            )
+
         # Perform voice to text conversion
-        recognized_text, confidence = await speech_service.voice_to_text(
-            audio_data=request.audio_data,
+        recognized_text, confidence = await speech_service.voice_to_text_bytes(
+            audio_bytes=audio_bytes,
             language=request.language
         )
 
@@ -131,7 +252,7 @@ async def voice_to_text(request: VoiceToTextRequest):
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Voice to text conversion failed: {str(e)}")
+        logger.error("Voice to text conversion failed: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Voice to text conversion failed: {str(e)}"
@@ -149,7 +270,7 @@ async def speech_to_text(
     """Convert uploaded audio file to text using speech recognition"""
     try:
         # Validate language code
-        if language not in settings.supported_languages:
+        if language not in supported_language_codes:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"Unsupported language: {language}"
@@ -162,15 +283,15 @@ async def speech_to_text(
                 detail="File must be an audio file"
             )
 
-        # Read audio file content
-        audio_content = await audio.read()
-
-        # Convert to base64 for processing
-        audio_base64 = base64.b64encode(audio_content).decode('utf-8')
+        # Read audio file content in chunks so large uploads don't block the event loop
+        chunks = []
+        while chunk := await audio.read(UPLOAD_CHUNK_SIZE):
+            chunks.append(chunk)
+        audio_content = b"".join(chunks)
 
-        # Perform voice to text conversion
-        recognized_text, confidence = await speech_service.voice_to_text(
-            audio_data=audio_base64,
+        # Perform voice to text conversion on the raw bytes, no base64 round-trip
+        recognized_text, confidence = await speech_service.voice_to_text_bytes(
+            audio_bytes=audio_content,
             language=language
         )
 
@@ -185,7 +306,7 @@ async def speech_to_text(
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Speech to text conversion failed: {str(e)}")
+        logger.error("Speech to text conversion failed: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Speech to text conversion failed: {str(e)}"
@@ -201,7 +322,7 @@ async def text_to_speech(request: TextToSpeechRequest):
     """Convert text to speech audio"""
     try:
         # Validate language code
-        if request.language not in settings.supported_languages:
+        if request.language not in supported_language_codes:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"Unsupported language: {request.language}"
@@ -224,7 +345,7 @@ async def text_to_speech(request: TextToSpeechRequest):
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Text to speech conversion failed: {str(e)}")
+        logger.error("Text to speech conversion failed: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Text to speech conversion failed: {str(e)}"
@@ -238,24 +359,55 @@ async def text_to_speech(request: TextToSpeechRequest):
 async def get_audio_file(filename: str):
     """Serve generated audio files"""
     try:
-        audio_path = os.path.join("app/static/audio", filename)
+        audio_path = os.path.abspath(os.path.join(AUDIO_DIR, filename))
+
+        # Reject names that resolve outside the audio directory
+        if os.path.commonpath([AUDIO_DIR, audio_path]) != AUDIO_DIR:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Audio file not found"
+            )
+
+        # Speech that is still being synthesized is served once it is written
+        try:
+            await speech_service.wait_for_audio(filename)
+        except Exception as e:
+            logger.error("Failed to serve audio file: %s", e)
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=str(e)
+            )
+
+        # A single stat both checks existence and feeds ETag/Last-Modified
+        try:
+            stat_result = os.stat(audio_path)
+        except FileNotFoundError:
+            stat_result = None
 
-        if not os.path.exists(audio_path):
+        if stat_result is None or not stat.S_ISREG(stat_result.st_mode):
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Audio file not found"
             )
 
+        # File names are content hashes, so a name always holds the same audio;
+        # FileResponse sends the body with sendfile where the server supports it
+        audio_id = os.path.splitext(filename)[0]
         return FileResponse(
             path=audio_path,
             media_type="audio/mpeg",
-            filename=filename
+            filename=filename,
+            stat_result=stat_result,
+            headers={
+                "Cache-Control": "public, max-age=31536000, immutable",
+                "ETag": f'"{audio_id}"'
+            }
         )
 
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Failed to serve audio file: {str(e)}")
+        logger.error("Failed to serve audio file: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to serve audio file"
@@ -275,7 +427,7 @@ async def detect_language(text: str):
                 detail="Text cannot be empty"
             )
 
-        detected_language = await gemini_service.detect_language(text)
+        detected_language = await get_gemini_service().detect_language(text)
 
         return {
             "text": text,
@@ -286,7 +438,7 @@ async def detect_language(text: str):
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Language detection failed: {str(e)}")
+        logger.error("Language detection failed: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Language detection failed: {str(e)}"
@@ -1,7 +1,7 @@
 """
 Pydantic models for request/response validation
 """
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from pydantic import BaseModel, Field
 
 
@@ -41,6 +41,77 @@ class TranslationResponse(BaseModel):
         }
 
 
+class MultiTranslationRequest(BaseModel):
+    """Request model for translation into several target languages"""
+    text: str = Field(..., min_length=1, max_length=5000, description="Text to translate")
+    source_language: str = Field(..., min_length=2, max_length=5, description="Source language code")
+    target_languages: List[str] = Field(..., min_length=1, max_length=25, description="Target language codes")
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "text": "नमस्ते, आज का समाचार क्या है?",
+                "source_language": "hi",
+                "target_languages": ["kn", "ta", "en"]
+            }
+        }
+
+
+class MultiTranslationResponse(BaseModel):
+    """Response model for translation into several target languages"""
+    original_text: str
+    source_language: str
+    translations: Dict[str, str]
+    confidence_scores: Dict[str, Optional[float]]
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "original_text": "नमस्ते, आज का समाचार क्या है?",
+                "source_language": "hi",
+                "translations": {
+                    "kn": "ನಮಸ್ಕಾರ, ಇಂದಿನ ಸುದ್ದಿ ಏನು?",
+                    "en": "Hello, what is today's news?"
+                },
+                "confidence_scores": {"kn": 0.95, "en": 0.9}
+            }
+        }
+
+
+class AutoTranslationRequest(BaseModel):
+    """Request model for translation with automatic source language detection"""
+    text: str = Field(..., min_length=1, max_length=5000, description="Text to translate")
+    target_language: str = Field(..., min_length=2, max_length=5, description="Target language code")
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "text": "नमस्ते, आज का समाचार क्या है?",
+                "target_language": "kn"
+            }
+        }
+
+
+class AutoTranslationResponse(BaseModel):
+    """Response model for translation with automatic source language detection"""
+    original_text: str
+    translated_text: str
+    source_language: str
+    target_language: str
+    confidence_score: Optional[float] = None
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "original_text": "नमस्ते, आज का समाचार क्या है?",
+                "translated_text": "ನಮಸ್ಕಾರ, ಇಂದಿನ ಸುದ್ದಿ ಏನು?",
+                "source_language": "hi",
+                "target_language": "kn",
+                "confidence_score": 0.95
+            }
+        }
+
+
 class VoiceToTextRequest(BaseModel):
     """Request model for voice to text conversion"""
     audio_data: str = Field(..., description="Base64 encoded audio data")
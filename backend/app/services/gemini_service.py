@@ -1,13 +1,171 @@
 """
 Google Gemini API service for text translation
 """
+import asyncio
+import bisect
+import functools
+import hashlib
+import json
 import logging
-from typing import Optional, Tuple
+import re
+from typing import Dict, List, Optional, Tuple
 import google.generativeai as genai
-from app.config import settings
+from cachetools import TTLCache
+from app.config import settings, supported_language_codes
+from app.utils.batching import LoopBinding, MicroBatcher
 
 logger = logging.getLogger(__name__)
 
+# Concurrent translations for the same language pair are coalesced into one
+# Gemini call: requests arriving within the window are sent together.
+BATCH_WINDOW_SECONDS = 0.05
+MAX_BATCH_SIZE = 8
+# Bounds the combined input of a batch so its reply stays within the output limit
+MAX_BATCH_CHARS = 2000
+
+# Matches one "N. translation" line of a batched response
+_NUMBERED_LINE = re.compile(r"^\s*(\d+)[.)]\s*(.*)$")
+
+# Prompt templates; only the per-request parts are filled in with str.format
+_TRANSLATE_PROMPT = """
+            You are a professional translator specializing in news and media content.
+
+            Task: Translate the following text from {source} to {target}.
+
+            Instructions:
+            1. Maintain the original meaning and context
+            2. Use appropriate formal language suitable for news content
+            3. Preserve any proper nouns, names, and technical terms
+            4. Ensure cultural sensitivity and accuracy
+            5. Return ONLY the translated text, no explanations or additional content
+
+            Text to translate:
+            {text}
+
+            Translation:
+            """
+
+_TRANSLATE_BATCH_PROMPT = """
+            You are a professional translator specializing in news and media content.
+
+            Task: Translate each numbered line below from {source} to {target}.
+
+            Instructions:
+            1. Maintain the original meaning and context
+            2. Use appropriate formal language suitable for news content
+            3. Preserve any proper nouns, names, and technical terms
+            4. Ensure cultural sensitivity and accuracy
+            5. Return exactly one line per input line, formatted as "<number>. <translation>"
+            6. Return ONLY the numbered translations, no explanations or additional content
+
+            Lines to translate:
+            {lines}
+
+            Translations:
+            """
+
+_DETECT_PROMPT = f"""
+            Detect the language of the following text and return ONLY the ISO 639-1 language code (2 letters).
+
+            Supported languages: {', '.join(settings.supported_languages)}
+
+            Text: {{text}}
+
+            Language code:
+            """
+
+_DETECT_TRANSLATE_PROMPT = f"""
+            You are a professional translator specializing in news and media content.
+
+            Task: Detect the language of the following text, then translate it to {{target}}.
+
+            Instructions:
+            1. The detected language must be one of these ISO 639-1 codes: {', '.join(settings.supported_languages)}
+            2. Maintain the original meaning and context
+            3. Use appropriate formal language suitable for news content
+            4. Preserve any proper nouns, names, and technical terms
+            5. Reply with ONLY a JSON object: {{{{"source_language": "<code>", "translation": "<translated text>"}}}}
+
+            Text to translate:
+            {{text}}
+
+            JSON:
+            """
+
+
+# Unicode blocks whose script identifies a single supported language, sorted
+# by start. Scripts shared by several supported languages (Latin, Arabic for
+# ar/ur, Devanagari for hi/mr) are absent and are left to Gemini.
+_SCRIPT_RANGES = (
+    (0x0400, 0x04FF, "ru"),  # Cyrillic
+    (0x0980, 0x09FF, "bn"),  # Bengali
+    (0x0A00, 0x0A7F, "pa"),  # Gurmukhi
+    (0x0A80, 0x0AFF, "gu"),  # Gujarati
+    (0x0B80, 0x0BFF, "ta"),  # Tamil
+    (0x0C00, 0x0C7F, "te"),  # Telugu
+    (0x0C80, 0x0CFF, "kn"),  # Kannada
+    (0x0D00, 0x0D7F, "ml"),  # Malayalam
+    (0x3040, 0x30FF, "ja"),  # Hiragana and Katakana
+    (0x4E00, 0x9FFF, "zh"),  # CJK Unified Ideographs
+    (0xAC00, 0xD7AF, "ko"),  # Hangul Syllables
+)
+_SCRIPT_RANGE_STARTS = [start for start, _, _ in _SCRIPT_RANGES]
+
+# Number of letters inspected by the script check
+_SCRIPT_SAMPLE_SIZE = 32
+
+
+def _script_language(char: str) -> Optional[str]:
+    """Return the language identified by the script of char, if any"""
+    codepoint = ord(char)
+    index = bisect.bisect_right(_SCRIPT_RANGE_STARTS, codepoint) - 1
+    if index >= 0:
+        _, end, language = _SCRIPT_RANGES[index]
+        if codepoint <= end:
+            return language
+    return None
+
+
+def _detect_by_script(text: str) -> Optional[str]:
+    """
+    Detect the language of text from its Unicode script alone
+
+    Args:
+        text: Text to analyze
+
+    Returns:
+        Language code, or None when the script does not settle the language
+    """
+    languages = set()
+    sampled = 0
+    for char in text:
+        if not char.isalpha():
+            continue
+        language = _script_language(char)
+        if language is None:
+            return None
+        languages.add(language)
+        sampled += 1
+        if sampled >= _SCRIPT_SAMPLE_SIZE:
+            break
+
+    # Japanese mixes kana with Han characters
+    if "ja" in languages and languages <= {"ja", "zh"}:
+        return "ja"
+    if len(languages) == 1:
+        return languages.pop()
+    return None
+
+
+def _text_digest(text: str) -> bytes:
+    """Return a compact hash of text for use in cache keys"""
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+
+def _parse_json_reply(reply: str) -> dict:
+    """Parse the JSON object in a model reply, ignoring any Markdown fence around it"""
+    return json.loads(reply[reply.index("{"):reply.rindex("}") + 1])
+
 
 class GeminiTranslationService:
     """Service for handling text translation using Google Gemini API"""
@@ -17,8 +175,28 @@ class GeminiTranslationService:
         if not settings.gemini_api_key:
             raise ValueError("GEMINI_API_KEY environment variable is required")
 
-        genai.configure(api_key=settings.gemini_api_key)
-        self.model = genai.GenerativeModel('gemini-1.5-flash')
+        # The SDK keeps one client, and so one long-lived gRPC channel, per
+        # process; all calls below reuse it through this single model object.
+        self.model = self._create_model()
+
+        # Per (source, target) batchers, created on first use of the pair
+        self._batchers: Dict[Tuple[str, str], MicroBatcher] = {}
+
+        # Caps concurrent Gemini calls; created on first use inside the event loop
+        self._gemini_semaphore: Optional[asyncio.Semaphore] = None
+
+        # Event loop that owns the semaphore and the model's async client
+        self._loop_binding = LoopBinding()
+
+        # Results keyed by (source, target, text hash) and text hash respectively
+        self._translation_cache = TTLCache(
+            maxsize=settings.translation_cache_size,
+            ttl=settings.translation_cache_ttl
+        )
+        self._detection_cache = TTLCache(
+            maxsize=settings.translation_cache_size,
+            ttl=settings.translation_cache_ttl
+        )
 
     async def translate_text(
         self,
@@ -38,48 +216,192 @@ class GeminiTranslationService:
             Tuple of (translated_text, confidence_score)
         """
         try:
-            # Get language names for better context
-            source_lang_name = settings.supported_languages.get(source_language, source_language)
-            target_lang_name = settings.supported_languages.get(target_language, target_language)
+            cache_key = (source_language, target_language, _text_digest(text))
+            cached = self._translation_cache.get(cache_key)
+            if cached is not None:
+                return cached
 
-            # Create a detailed prompt for better translation quality
-            prompt = f"""
-            You are a professional translator specializing in news and media content.
+            logger.info("Translating text from %s to %s", source_language, target_language)
 
-            Task: Translate the following text from {source_lang_name} to {target_lang_name}.
+            # Multi-line text cannot be split back out of a line-numbered
+            # batch response, so it is translated on its own
+            if "\n" in text:
+                translated_text = await self._translate_single(text, source_language, target_language)
+            else:
+                translated_text = await self._submit_to_batch(text, source_language, target_language)
 
-            Instructions:
-            1. Maintain the original meaning and context
-            2. Use appropriate formal language suitable for news content
-            3. Preserve any proper nouns, names, and technical terms
-            4. Ensure cultural sensitivity and accuracy
-            5. Return ONLY the translated text, no explanations or additional content
+            # Simple confidence estimation based on response quality
+            confidence_score = self._estimate_confidence(text, translated_text)
 
-            Text to translate:
-            {text}
+            logger.info("Translation completed with confidence: %s", confidence_score)
 
-            Translation:
-            """
+            self._translation_cache[cache_key] = (translated_text, confidence_score)
+            return translated_text, confidence_score
 
-            logger.info(f"Translating text from {source_language} to {target_language}")
+        except Exception as e:
+            logger.error("Translation failed: %s", e)
+            raise Exception(f"Translation failed: {str(e)}")
 
-            response = self.model.generate_content(prompt)
+    async def _generate(self, prompt: str):
+        """
+        Send a prompt to Gemini, waiting for a free slot if too many calls are in flight
 
-            if not response.text:
-                raise Exception("Empty response from Gemini API")
+        Args:
+            prompt: Prompt text
 
-            translated_text = response.text.strip()
+        Returns:
+            Gemini response
+        """
+        self._bind_to_running_loop()
 
-            # Simple confidence estimation based on response quality
-            confidence_score = self._estimate_confidence(text, translated_text)
+        async with self._gemini_semaphore:
+            return await self.model.generate_content_async(prompt)
 
-            logger.info(f"Translation completed with confidence: {confidence_score}")
+    def _bind_to_running_loop(self):
+        """Recreate the semaphore and the model's async client when called from a new event loop"""
+        first_use = self._loop_binding.loop is None
+        if not self._loop_binding.rebind():
+            return
 
-            return translated_text, confidence_score
+        self._gemini_semaphore = asyncio.Semaphore(settings.gemini_max_concurrency)
+        if not first_use:
+            # The SDK's async gRPC client belongs to the old loop as well
+            self.model = self._create_model()
+
+    @staticmethod
+    def _create_model() -> genai.GenerativeModel:
+        """
+        Configure the Gemini SDK and create the translation model
+
+        configure() also discards the SDK's cached clients, so the model
+        opens a new async client on first use.
 
+        Returns:
+            Gemini model
+        """
+        genai.configure(api_key=settings.gemini_api_key)
+        return genai.GenerativeModel('gemini-1.5-flash')
+
+    async def _submit_to_batch(self, text: str, source_language: str, target_language: str) -> str:
+        """
+        Queue text for batched translation and wait for its result
+
+        Args:
+            text: Single-line text to translate
+            source_language: Source language code
+            target_language: Target language code
+
+        Returns:
+            Translated text
+        """
+        pair = (source_language, target_language)
+        batcher = self._batchers.get(pair)
+        if batcher is None:
+            batcher = MicroBatcher(
+                functools.partial(self._run_batch, pair),
+                window_seconds=BATCH_WINDOW_SECONDS,
+                max_batch_size=MAX_BATCH_SIZE,
+                max_batch_weight=MAX_BATCH_CHARS,
+                weight=len
+            )
+            self._batchers[pair] = batcher
+
+        return await batcher.submit(text)
+
+    async def _run_batch(self, pair: Tuple[str, str], texts: List[str]) -> List:
+        """
+        Translate a batch of texts for one language pair
+
+        Args:
+            pair: (source_language, target_language) of the batch
+            texts: Single-line texts to translate
+
+        Returns:
+            Translation, or the exception raised for it, per text
+        """
+        try:
+            return await self._translate_batch(texts, *pair)
         except Exception as e:
-            logger.error(f"Translation failed: {str(e)}")
-            raise Exception(f"Translation failed: {str(e)}")
+            if len(texts) == 1:
+                raise
+
+            # One bad text (e.g. a blocked reply) must not fail the others;
+            # translate each text on its own, concurrently
+            logger.warning("Batched translation failed, retrying individually: %s", e)
+            return await asyncio.gather(
+                *(self._translate_single(text, *pair) for text in texts),
+                return_exceptions=True
+            )
+
+    async def _translate_single(self, text: str, source_language: str, target_language: str) -> str:
+        """
+        Translate one text with a single Gemini call
+
+        Args:
+            text: Text to translate
+            source_language: Source language code
+            target_language: Target language code
+
+        Returns:
+            Translated text
+        """
+        # Get language names for better context
+        source_lang_name = settings.supported_languages.get(source_language, source_language)
+        target_lang_name = settings.supported_languages.get(target_language, target_language)
+
+        # Create a detailed prompt for better translation quality
+        prompt = _TRANSLATE_PROMPT.format(source=source_lang_name, target=target_lang_name, text=text)
+
+        response = await self._generate(prompt)
+
+        if not response.text:
+            raise Exception("Empty response from Gemini API")
+
+        return response.text.strip()
+
+    async def _translate_batch(self, texts: List[str], source_language: str, target_language: str) -> List[str]:
+        """
+        Translate several single-line texts with one Gemini call
+
+        Args:
+            texts: Texts to translate
+            source_language: Source language code
+            target_language: Target language code
+
+        Returns:
+            Translations in the same order as texts
+        """
+        if len(texts) == 1:
+            return [await self._translate_single(texts[0], source_language, target_language)]
+
+        source_lang_name = settings.supported_languages.get(source_language, source_language)
+        target_lang_name = settings.supported_languages.get(target_language, target_language)
+        numbered_texts = "\n".join(f"{i}. {text}" for i, text in enumerate(texts, start=1))
+
+        prompt = _TRANSLATE_BATCH_PROMPT.format(
+            source=source_lang_name,
+            target=target_lang_name,
+            lines=numbered_texts
+        )
+
+        logger.info("Translating batch of %d texts from %s to %s", len(texts), source_language, target_language)
+
+        response = await self._generate(prompt)
+
+        if not response.text:
+            raise Exception("Empty response from Gemini API")
+
+        translations = {}
+        for line in response.text.splitlines():
+            match = _NUMBERED_LINE.match(line)
+            if match:
+                translations[int(match.group(1))] = match.group(2).strip()
+
+        if not all(translations.get(i) for i in range(1, len(texts) + 1)):
+            # The model did not keep the numbering; _run_batch retries each text
+            raise Exception("Batched translation response could not be split")
+
+        return [translations[i] for i in range(1, len(texts) + 1)]
 
     def _estimate_confidence(self, original_text: str, translated_text: str) -> float:
         """
@@ -93,25 +415,22 @@ class GeminiTranslationService:
             Confidence score between 0 and 1
         """
         try:
-            # Basic heuristics for confidence estimation
-            original_length = len(original_text.split())
-            translated_length = len(translated_text.split())
+            # Basic heuristics for confidence estimation; counting spaces
+            # gives the word count without building word lists
+            original_length = original_text.count(" ") + 1
+            translated_length = translated_text.count(" ") + 1
 
             # Length ratio check (reasonable translations should have similar word counts)
             length_ratio = min(original_length, translated_length) / max(original_length, translated_length)
 
-            # Base confidence
-            confidence = 0.8
-
-            # Adjust based on length ratio
-            if length_ratio > 0.7:
-                confidence += 0.1
-            elif length_ratio < 0.3:
-                confidence -= 0.2
-
-            # Check for empty or very short translations
-            if translated_length < 2:
-                confidence -= 0.3
+            # Base confidence, adjusted for the length ratio and for very
+            # short translations (the two ratio adjustments are exclusive)
+            confidence = (
+                0.8
+                + 0.1 * (length_ratio > 0.7)
+                - 0.2 * (length_ratio < 0.3)
+                - 0.3 * (translated_length < 2)
+            )
 
             # Ensure confidence is between 0 and 1
             confidence = max(0.0, min(1.0, confidence))
@@ -132,30 +451,105 @@ class GeminiTranslationService:
             Language code
         """
         try:
-            prompt = f"""
-            Detect the language of the following text and return ONLY the ISO 639-1 language code (2 letters).
-
-            Supported languages: {', '.join(settings.supported_languages.keys())}
+            # Most non-Latin scripts identify the language without a Gemini call
+            script_language = _detect_by_script(text)
+            if script_language is not None:
+                return script_language
 
-            Text: {text}
+            cache_key = _text_digest(text)
+            cached = self._detection_cache.get(cache_key)
+            if cached is not None:
+                return cached
 
-            Language code:
-            """
+            prompt = _DETECT_PROMPT.format(text=text)
 
-            response = self.model.generate_content(prompt)
+            response = await self._generate(prompt)
             detected_language = response.text.strip().lower()
 
             # Validate the detected language
-            if detected_language in settings.supported_languages:
+            if detected_language in supported_language_codes:
+                self._detection_cache[cache_key] = detected_language
                 return detected_language
             else:
-                logger.warning(f"Detected language '{detected_language}' not supported, defaulting to 'en'")
+                logger.warning("Detected language '%s' not supported, defaulting to 'en'", detected_language)
                 return "en"
 
         except Exception as e:
-            logger.error(f"Language detection failed: {str(e)}")
+            logger.error("Language detection failed: %s", e)
             return "en"  # Default to English if detection fails
 
+    async def detect_and_translate(
+        self,
+        text: str,
+        target_language: str
+    ) -> Tuple[str, str, Optional[float]]:
+        """
+        Detect the language of text and translate it in a single Gemini call
+
+        Args:
+            text: Text to translate
+            target_language: Target language code
+
+        Returns:
+            Tuple of (source_language, translated_text, confidence_score)
+        """
+        digest = _text_digest(text)
+
+        # A known source language makes this a plain (cached, batched) translation
+        source_language = _detect_by_script(text) or self._detection_cache.get(digest)
+        if source_language is not None:
+            translated_text, confidence_score = await self.translate_text(text, source_language, target_language)
+            return source_language, translated_text, confidence_score
+
+        try:
+            target_lang_name = settings.supported_languages.get(target_language, target_language)
+            prompt = _DETECT_TRANSLATE_PROMPT.format(target=target_lang_name, text=text)
+
+            logger.info("Detecting language and translating text to %s", target_language)
+
+            response = await self._generate(prompt)
+            result = _parse_json_reply(response.text)
+
+            source_language = str(result["source_language"]).strip().lower()
+            translated_text = str(result["translation"]).strip()
+
+            if source_language not in supported_language_codes or not translated_text:
+                raise ValueError(f"Unusable response: {response.text.strip()[:100]}")
+
+        except Exception as e:
+            # Fall back to the two-call path, which has its own error handling
+            logger.warning("Fused detect and translate failed, using separate calls: %s", e)
+            source_language = await self.detect_language(text)
+            translated_text, confidence_score = await self.translate_text(text, source_language, target_language)
+            return source_language, translated_text, confidence_score
+
+        confidence_score = self._estimate_confidence(text, translated_text)
+
+        self._detection_cache[digest] = source_language
+        self._translation_cache[(source_language, target_language, digest)] = (translated_text, confidence_score)
+
+        return source_language, translated_text, confidence_score
+
+    async def aclose(self):
+        """Stop the batching workers and any batches still in flight"""
+        await asyncio.gather(*(batcher.aclose() for batcher in self._batchers.values()))
+        self._batchers.clear()
+
+
+# Global service instance, created on first use so that importing this module
+# needs no API key and each worker process configures its own client
+_gemini_service: Optional[GeminiTranslationService] = None
+
+
+def get_gemini_service() -> GeminiTranslationService:
+    """Return the global Gemini service, creating it on first use"""
+    global _gemini_service
+    if _gemini_service is None:
+        _gemini_service = GeminiTranslationService()
+    return _gemini_service
+
 
-# Global service instance
-gemini_service = GeminiTranslationService()
+async def close_gemini_service():
+    """Shut down the global Gemini service if it was ever created"""
+    if _gemini_service is not None:
+        await _gemini_service.aclose()
@@ -1,29 +1,251 @@
 """
 Speech recognition and text-to-speech services
 """
+import asyncio
+import functools
 import logging
 import base64
+import hashlib
 import io
+import json
 import os
+import re
+import string
+import subprocess
 import tempfile
+import time
 import uuid
-from typing import Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+import httpx
+import numpy as np
 import speech_recognition as sr
+from cachetools import TTLCache
 from gtts import gTTS
+from gtts.tokenizer.symbols import ALL_PUNC
+from mutagen.mp3 import MP3
 from pydub import AudioSegment
 from app.config import settings
+from app.utils.batching import LoopBinding, MicroBatcher
 
 logger = logging.getLogger(__name__)
 
+# Google Speech Recognition endpoint; the API key comes from settings.google_speech_api_key
+GOOGLE_SPEECH_URL = "http://www.google.com/speech-api/v2/recognize"
+GOOGLE_SPEECH_TIMEOUT_SECONDS = 10.0
+
+# Speech recognition requests arriving within this window share one decode pass
+STT_BATCH_WINDOW_SECONDS = 0.02
+STT_MAX_BATCH_SIZE = 8
+
+# How long a failed background synthesis is reported to audio file requests
+FAILED_AUDIO_TTL_SECONDS = 300
+
+# Polling for audio that another worker process may still be synthesizing
+AUDIO_WAIT_TIMEOUT_SECONDS = 30.0
+AUDIO_POLL_INTERVAL_SECONDS = 0.25
+
+# Names of generated audio files, as built by text_to_speech
+_AUDIO_FILENAME = re.compile(r"^[0-9a-f]{32}\.mp3$")
+
+# Text made only of these characters leaves gTTS nothing to send
+_UNSPEAKABLE_CHARS = ALL_PUNC + string.whitespace
+
+# Mapping for speech recognition language codes
+_RECOGNITION_LANGUAGE_CODES = {
+    "en": "en-US",
+    "hi": "hi-IN",
+    "kn": "kn-IN",
+    "ta": "ta-IN",
+    "te": "te-IN",
+    "ml": "ml-IN",
+    "bn": "bn-IN",
+    "gu": "gu-IN",
+    "mr": "mr-IN",
+    "pa": "pa-IN",
+    "ur": "ur-PK",
+    "es": "es-ES",
+    "fr": "fr-FR",
+    "de": "de-DE",
+    "it": "it-IT",
+    "pt": "pt-PT",
+    "ru": "ru-RU",
+    "ja": "ja-JP",
+    "ko": "ko-KR",
+    "zh": "zh-CN",
+    "ar": "ar-SA"
+}
+
+# gTTS uses standard ISO 639-1 codes for most languages
+# Some adjustments for specific languages
+_TTS_LANGUAGE_CODES = {
+    "kn": "kn",  # Kannada
+    "ta": "ta",  # Tamil
+    "te": "te",  # Telugu
+    "ml": "ml",  # Malayalam
+    "bn": "bn",  # Bengali
+    "gu": "gu",  # Gujarati
+    "mr": "mr",  # Marathi
+    "pa": "pa",  # Punjabi
+    "ur": "ur",  # Urdu
+    "zh": "zh-cn"  # Chinese (Simplified)
+}
+
+# NumPy sample types for the little-endian PCM that sr.AudioFile streams yield;
+# 24-bit samples have no NumPy type and are widened by _pcm_samples
+_SAMPLE_DTYPES = {1: np.int8, 2: np.dtype("<i2"), 4: np.dtype("<i4")}
+
+# PCM bit depths passed to speech_recognition without converting through pydub
+_PASSTHROUGH_BITS_PER_SAMPLE = (b"\x08\x00", b"\x10\x00", b"\x20\x00")
+
+# Container signatures as (offset, magic bytes, pydub/ffmpeg format)
+_AUDIO_SIGNATURES = (
+    (0, b"ID3", "mp3"),
+    (0, b"OggS", "ogg"),
+    (0, b"fLaC", "flac"),
+    (0, b"#!AMR", "amr"),
+    (0, b"\x1a\x45\xdf\xa3", "webm"),
+    (4, b"ftyp", "mp4"),
+)
+
+
+def _is_pcm_wav(data: bytes) -> bool:
+    """
+    Check whether WAV content is plain PCM that can skip conversion
+
+    24-bit PCM is excluded; pydub widens it to 32-bit like other formats.
+
+    Args:
+        data: WAV file content
+
+    Returns:
+        True for an 8, 16 or 32-bit PCM format chunk directly after the RIFF header
+    """
+    return (
+        data[12:16] == b"fmt "
+        and data[20:22] == b"\x01\x00"
+        and data[34:36] in _PASSTHROUGH_BITS_PER_SAMPLE
+    )
+
+
+def _pcm_samples(buffer: bytes, sample_width: int) -> np.ndarray:
+    """
+    View little-endian PCM as a NumPy array of signed samples
+
+    Args:
+        buffer: PCM frames, whole samples only
+        sample_width: Bytes per sample, 1 to 4
+
+    Returns:
+        Array of samples at their original scale
+    """
+    if sample_width == 3:
+        # Place each 3-byte sample in the top of an int32 and shift back down,
+        # which keeps the sign of the 24-bit value
+        padded = np.zeros((len(buffer) // 3, 4), dtype=np.uint8)
+        padded[:, 1:] = np.frombuffer(buffer, dtype=np.uint8).reshape(-1, 3)
+        return padded.view("<i4").ravel() >> 8
+    return np.frombuffer(buffer, dtype=_SAMPLE_DTYPES[sample_width])
+
+
+def _atempo_filter(speed: float) -> str:
+    """
+    Build an ffmpeg atempo filter chain for a speed multiplier
+
+    A single atempo stage accepts factors between 0.5 and 2.0, so larger
+    changes are split into several chained stages.
+
+    Args:
+        speed: Speed multiplier
+
+    Returns:
+        ffmpeg audio filter string
+    """
+    stages = []
+    while speed > 2.0:
+        stages.append(2.0)
+        speed /= 2.0
+    while speed < 0.5:
+        stages.append(0.5)
+        speed /= 0.5
+    stages.append(speed)
+    return ",".join(f"atempo={stage:g}" for stage in stages)
+
+
+def _sniff_format(data: bytes) -> Optional[str]:
+    """
+    Guess the audio container format from the leading bytes
+
+    Args:
+        data: Audio file content
+
+    Returns:
+        Format name, or None to let ffmpeg probe the input
+    """
+    if data[:4] == b"RIFF" and data[8:12] == b"WAVE":
+        return "wav"
+
+    for offset, magic, format_name in _AUDIO_SIGNATURES:
+        if data[offset:offset + len(magic)] == magic:
+            return format_name
+
+    # Bare MPEG audio frame sync; a zero layer field means ADTS AAC instead
+    if len(data) >= 2 and data[0] == 0xFF and data[1] & 0xE0 == 0xE0:
+        return "mp3" if data[1] & 0x06 else "aac"
+
+    return None
+
 
 class SpeechService:
     """Service for handling speech recognition and text-to-speech"""
 
+    # Generated speech files; created once by main.py before the static mount
+    audio_output_dir = "app/static/audio"
+
     def __init__(self):
         """Initialize the speech service"""
         self.recognizer = sr.Recognizer()
-        self.audio_output_dir = "app/static/audio"
-        os.makedirs(self.audio_output_dir, exist_ok=True)
+        # HTTP and worker pools, opened on first use by _get_executor()
+        self._http: Optional[httpx.Client] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        # Background syntheses still running, by audio id
+        self._pending_audio: Dict[str, asyncio.Task] = {}
+        # Errors of recently failed syntheses, by audio id
+        self._failed_audio = TTLCache(maxsize=1024, ttl=FAILED_AUDIO_TTL_SECONDS)
+        # Requests arriving together are decoded in one pass, then recognized in parallel
+        self._stt_batcher = MicroBatcher(
+            self._run_stt_batch,
+            window_seconds=STT_BATCH_WINDOW_SECONDS,
+            max_batch_size=STT_MAX_BATCH_SIZE
+        )
+        # Event loop that owns the pending syntheses
+        self._loop_binding = LoopBinding()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """
+        Return the worker pool, opening it and the HTTP connection pool on first use
+
+        All work that uses the HTTP client runs on the worker pool, so both are
+        opened here, on the event loop thread, before any such work is queued.
+
+        Returns:
+            Speech worker pool
+        """
+        if self._executor is None:
+            # Pooled keep-alive connections to the speech API, reused across requests
+            self._http = httpx.Client(timeout=GOOGLE_SPEECH_TIMEOUT_SECONDS)
+            # Blocking recognition, gTTS and ffmpeg work runs here, bounded so
+            # concurrent requests cannot start an unlimited number of ffmpeg processes
+            self._executor = ThreadPoolExecutor(
+                max_workers=settings.speech_max_workers,
+                thread_name_prefix="speech"
+            )
+        return self._executor
+
+    def _bind_to_running_loop(self):
+        """Forget pending syntheses of an earlier event loop; their tasks never finish here"""
+        if self._loop_binding.rebind():
+            self._pending_audio = {}
 
     async def voice_to_text(
         self,
@@ -43,101 +265,39 @@ class SpeechService:
         try:
             # Decode base64 audio data
             audio_bytes = base64.b64decode(audio_data)
+        except Exception as e:
+            logger.error("Voice to text conversion failed: %s", e)
+            raise Exception(f"Voice to text conversion failed: {str(e)}")
 
-            # Create temporary file for audio processing
-            with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as temp_file:
-                temp_file_path = temp_file.name
+        return await self.voice_to_text_bytes(audio_bytes, language)
 
-            try:
-                # Try to convert audio to WAV format using pydub for better compatibility
-                try:
-                    # First, save the raw audio data
-                    with open(temp_file_path.replace('.wav', '.raw'), 'wb') as raw_file:
-                        raw_file.write(audio_bytes)
-
-                    # Try to load as different formats and convert to WAV
-                    audio_segment = None
-                    for format_type in ['m4a', 'mp3', 'wav', 'ogg', 'webm']:
-                        try:
-                            if format_type == 'm4a':
-                                audio_segment = AudioSegment.from_file(
-                                    temp_file_path.replace('.wav', '.raw'),
-                                    format='m4a'
-                                )
-                            elif format_type == 'mp3':
-                                audio_segment = AudioSegment.from_mp3(temp_file_path.replace('.wav', '.raw'))
-                            elif format_type == 'wav':
-                                audio_segment = AudioSegment.from_wav(temp_file_path.replace('.wav', '.raw'))
-                            elif format_type == 'ogg':
-                                audio_segment = AudioSegment.from_ogg(temp_file_path.replace('.wav', '.raw'))
-                            elif format_type == 'webm':
-                                audio_segment = AudioSegment.from_file(
-                                    temp_file_path.replace('.wav', '.raw'),
-                                    format='webm'
-                                )
-                            break
-                        except Exception:
-                            continue
-
-                    if audio_segment:
-                        # Convert to WAV format for speech recognition
-                        audio_segment.export(temp_file_path, format="wav")
-                    else:
-                        # Fallback: write raw bytes as WAV
-                        with open(temp_file_path, 'wb') as wav_file:
-                            wav_file.write(audio_bytes)
-
-                except Exception as conversion_error:
-                    logger.warning(f"Audio conversion failed, using raw data: {conversion_error}")
-                    # Fallback: write raw bytes
-                    with open(temp_file_path, 'wb') as wav_file:
-                        wav_file.write(audio_bytes)
-
-                # Load audio file for speech recognition
-                with sr.AudioFile(temp_file_path) as source:
-                    # Adjust for ambient noise
-                    self.recognizer.adjust_for_ambient_noise(source, duration=0.5)
-                    # Record the audio
-                    audio = self.recognizer.record(source)
-
-                # Convert language code to format expected by speech_recognition
-                recognition_language = self._get_recognition_language_code(language)
-
-                # Perform speech recognition
-                try:
-                    # Try Google Speech Recognition first
-                    text = self.recognizer.recognize_google(
-                        audio,
-                        language=recognition_language
-                    )
-                    confidence = 0.85  # Google API doesn't provide confidence, estimate
-
-                except sr.RequestError:
-                    # Fallback to offline recognition if available
-                    try:
-                        text = self.recognizer.recognize_sphinx(audio)
-                        confidence = 0.7  # Lower confidence for offline recognition
-                    except sr.RequestError:
-                        raise Exception("Speech recognition service unavailable")
-
-                logger.info(f"Speech recognition successful: {text[:50]}...")
-                return text, confidence
-
-            finally:
-                # Clean up temporary files
-                for temp_path in [temp_file_path, temp_file_path.replace('.wav', '.raw')]:
-                    if os.path.exists(temp_path):
-                        try:
-                            os.unlink(temp_path)
-                        except Exception:
-                            pass  # Ignore cleanup errors
+    async def voice_to_text_bytes(
+        self,
+        audio_bytes: bytes,
+        language: str = "en"
+    ) -> Tuple[str, Optional[float]]:
+        """
+        Convert raw voice audio bytes to text
+
+        Args:
+            audio_bytes: Audio file content
+            language: Language code for recognition
+
+        Returns:
+            Tuple of (recognized_text, confidence_score)
+        """
+        try:
+            text, confidence = await self._stt_batcher.submit((audio_bytes, language))
+
+            logger.info("Speech recognition successful: %s...", text[:50])
+            return text, confidence
 
         except sr.UnknownValueError:
             raise Exception("Could not understand the audio")
         except sr.RequestError as e:
             raise Exception(f"Speech recognition service error: {str(e)}")
         except Exception as e:
-            logger.error(f"Voice to text conversion failed: {str(e)}")
+            logger.error("Voice to text conversion failed: %s", e)
             raise Exception(f"Voice to text conversion failed: {str(e)}")
 
     async def text_to_speech(
@@ -155,68 +315,480 @@ class SpeechService:
             voice_speed: Speed multiplier for speech
 
         Returns:
-            Tuple of (audio_file_path, duration)
+            Tuple of (audio_file_path, duration); duration is None while the
+            audio is still being synthesized
         """
         try:
-            # Generate unique filename
-            audio_id = str(uuid.uuid4())
+            # Name the file after its inputs so repeated requests reuse it
+            audio_id = hashlib.blake2b(
+                f"{language}|{voice_speed}|{text}".encode("utf-8"),
+                digest_size=16
+            ).hexdigest()
             audio_filename = f"{audio_id}.mp3"
             audio_path = os.path.join(self.audio_output_dir, audio_filename)
+            self._bind_to_running_loop()
+
+            # Look the file up off the event loop, on the default pool so cache hits
+            # never queue behind synthesis work; prune_audio_files may delete it meanwhile
+            duration = await asyncio.to_thread(self._cached_duration, audio_path)
+
+            if duration is None:
+                # Synthesize in the background and return the URL right away;
+                # get_audio_file waits for the file via wait_for_audio()
+                if audio_id not in self._pending_audio:
+                    # Building the gTTS object validates text and language up front
+                    tts = self._create_tts(text, language, voice_speed)
+                    self._failed_audio.pop(audio_id, None)
+                    task = asyncio.create_task(self._synthesize(tts, voice_speed, audio_path))
+                    self._pending_audio[audio_id] = task
+                    task.add_done_callback(functools.partial(self._on_synthesis_done, audio_id))
+
+            # Return relative path for API response
+            relative_path = f"/api/v1/audio/{audio_filename}"
+
+            logger.info("Text to speech audio available at: %s", relative_path)
+            return relative_path, duration
+
+        except Exception as e:
+            logger.error("Text to speech conversion failed: %s", e)
+            raise Exception(f"Text to speech conversion failed: {str(e)}")
+
+    async def wait_for_audio(self, filename: str):
+        """
+        Wait until a generated audio file that is still being synthesized is written
 
-            # Convert language code to format expected by gTTS
-            tts_language = self._get_tts_language_code(language)
+        Pending syntheses are tracked per process. With several uvicorn workers
+        the POST may have been served by another process; a missing file with
+        a generated audio name is then polled for until it appears or
+        AUDIO_WAIT_TIMEOUT_SECONDS pass. Failures in another process are not
+        seen here and end as a missing file.
 
-            # Create gTTS object
-            tts = gTTS(
-                text=text,
-                lang=tts_language,
-                slow=(voice_speed < 0.8)  # Use slow speech for speeds below 0.8
+        Args:
+            filename: Audio file name as returned in the audio URL
+
+        Raises:
+            Exception: If the synthesis of the file failed recently
+        """
+        self._bind_to_running_loop()
+        audio_id = os.path.splitext(filename)[0]
+        task = self._pending_audio.get(audio_id)
+        if task is not None:
+            await asyncio.wait([task])
+            if not task.cancelled() and task.exception() is not None:
+                raise Exception(f"Text to speech conversion failed: {task.exception()}")
+
+        error = self._failed_audio.get(audio_id)
+        if error is not None:
+            raise Exception(f"Text to speech conversion failed: {error}")
+
+        if task is None and _AUDIO_FILENAME.match(filename):
+            audio_path = os.path.join(self.audio_output_dir, filename)
+            deadline = time.monotonic() + AUDIO_WAIT_TIMEOUT_SECONDS
+            while not os.path.exists(audio_path) and time.monotonic() < deadline:
+                await asyncio.sleep(AUDIO_POLL_INTERVAL_SECONDS)
+
+    async def _synthesize(self, tts: gTTS, voice_speed: float, audio_path: str):
+        """Run speech synthesis on the speech worker pool"""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(
+            self._get_executor(), self._synthesize_blocking, tts, voice_speed, audio_path
+        )
+
+    def _on_synthesis_done(self, audio_id: str, task: asyncio.Task):
+        """Forget a finished background synthesis, keeping and logging its failure, if any"""
+        self._pending_audio.pop(audio_id, None)
+        if not task.cancelled() and task.exception() is not None:
+            self._failed_audio[audio_id] = str(task.exception())
+            logger.error("Text to speech conversion failed: %s", task.exception())
+
+    async def _run_stt_batch(self, items: List[Tuple[bytes, str]]) -> List:
+        """
+        Decode a batch of audio and run recognition on each item
+
+        Args:
+            items: List of (audio_bytes, language) items
+
+        Returns:
+            Tuple of (recognized_text, confidence_score), or the exception
+            raised for it, per item
+        """
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        wav_buffers = await loop.run_in_executor(
+            executor, self._decode_batch_blocking, [audio_bytes for audio_bytes, _ in items]
+        )
+
+        # Recognition is network bound, so every item of the batch runs concurrently
+        return await asyncio.gather(*(
+            loop.run_in_executor(executor, self._recognize_wav_blocking, wav_buffer, language)
+            for wav_buffer, (_, language) in zip(wav_buffers, items)
+        ), return_exceptions=True)
+
+    def _decode_batch_blocking(self, audio_list: List[bytes]) -> List[io.BytesIO]:
+        """
+        Convert a batch of audio files to WAV, blocking until done
+
+        PCM WAV is passed through unchanged. When several inputs need decoding
+        they are converted by a single ffmpeg process instead of one each.
+
+        Args:
+            audio_list: Audio file contents
+
+        Returns:
+            In-memory WAV buffers, in the order of audio_list
+        """
+        wav_buffers: List[Optional[io.BytesIO]] = [None] * len(audio_list)
+        to_decode = []
+        for index, audio_bytes in enumerate(audio_list):
+            if _sniff_format(audio_bytes) == "wav" and _is_pcm_wav(audio_bytes):
+                wav_buffers[index] = io.BytesIO(audio_bytes)
+            else:
+                to_decode.append(index)
+
+        if len(to_decode) > 1:
+            try:
+                decoded = self._decode_with_ffmpeg([audio_list[index] for index in to_decode])
+                for index, wav_buffer in zip(to_decode, decoded):
+                    wav_buffers[index] = wav_buffer
+                return wav_buffers
+            except Exception as batch_error:
+                # One bad input fails the whole ffmpeg run; decode the items one by one
+                logger.warning("Batched audio conversion failed, decoding separately: %s", batch_error)
+
+        for index in to_decode:
+            wav_buffers[index] = self._to_wav(audio_list[index])
+
+        return wav_buffers
+
+    @staticmethod
+    def _decode_with_ffmpeg(audio_list: List[bytes]) -> List[io.BytesIO]:
+        """
+        Convert several audio files to WAV with one ffmpeg process
+
+        Args:
+            audio_list: Audio file contents
+
+        Returns:
+            In-memory WAV buffers, in the order of audio_list
+        """
+        with tempfile.TemporaryDirectory(prefix="stt-") as work_dir:
+            command = [AudioSegment.converter, "-y", "-hide_banner", "-loglevel", "error"]
+            for index, audio_bytes in enumerate(audio_list):
+                input_path = os.path.join(work_dir, f"input{index}")
+                with open(input_path, "wb") as input_file:
+                    input_file.write(audio_bytes)
+                command += ["-i", input_path]
+
+            # One output per input, mapped by input index
+            output_paths = [os.path.join(work_dir, f"output{index}.wav") for index in range(len(audio_list))]
+            for index, output_path in enumerate(output_paths):
+                command += ["-map", f"{index}:a:0", "-c:a", "pcm_s16le", "-f", "wav", output_path]
+
+            subprocess.run(command, check=True, capture_output=True)
+
+            wav_buffers = []
+            for output_path in output_paths:
+                with open(output_path, "rb") as output_file:
+                    wav_buffers.append(io.BytesIO(output_file.read()))
+            return wav_buffers
+
+    @staticmethod
+    def _to_wav(audio_bytes: bytes) -> io.BytesIO:
+        """
+        Convert one audio file to WAV in memory using pydub
+
+        Args:
+            audio_bytes: Audio file content
+
+        Returns:
+            In-memory WAV buffer
+        """
+        try:
+            audio_segment = AudioSegment.from_file(
+                io.BytesIO(audio_bytes),
+                format=_sniff_format(audio_bytes)
             )
+            wav_buffer = io.BytesIO()
+            audio_segment.export(wav_buffer, format="wav")
+            wav_buffer.seek(0)
+            return wav_buffer
+
+        except Exception as conversion_error:
+            logger.warning("Audio conversion failed, using raw data: %s", conversion_error)
+            # Fallback: treat the raw bytes as WAV
+            return io.BytesIO(audio_bytes)
+
+    def _recognize_wav_blocking(self, wav_buffer: io.BytesIO, language: str) -> Tuple[str, float]:
+        """
+        Run speech recognition on WAV audio, blocking until done
+
+        Args:
+            wav_buffer: In-memory WAV audio
+            language: Language code for recognition
 
-            # Save to temporary file first
-            with tempfile.NamedTemporaryFile(suffix=".mp3", delete=False) as temp_file:
-                tts.save(temp_file.name)
-                temp_audio_path = temp_file.name
+        Returns:
+            Tuple of (recognized_text, confidence_score)
+        """
+        # Load audio for speech recognition
+        with sr.AudioFile(wav_buffer) as source:
+            # Adjust for ambient noise
+            self._adjust_for_ambient_noise(source, duration=0.5)
+            # Read the rest of the audio in one call instead of record()'s
+            # chunk-by-chunk loop; the stream still converts to mono little-endian
+            audio = sr.AudioData(source.stream.read(), source.SAMPLE_RATE, source.SAMPLE_WIDTH)
+
+        # Convert language code to format expected by speech_recognition
+        recognition_language = self._get_recognition_language_code(language)
+
+        # Perform speech recognition
+        try:
+            # Try Google Speech Recognition first
+            text = self._recognize_google(audio, recognition_language)
+            confidence = 0.85  # Google API doesn't provide confidence, estimate
 
+        except sr.RequestError:
+            # Fallback to offline recognition if available
             try:
-                # Load audio for speed adjustment if needed
-                if voice_speed != 1.0:
-                    audio = AudioSegment.from_mp3(temp_audio_path)
-
-                    # Adjust speed
-                    if voice_speed > 1.0:
-                        # Speed up
-                        audio = audio.speedup(playback_speed=voice_speed)
-                    elif voice_speed < 1.0:
-                        # Slow down (already handled by gTTS slow parameter for very slow speeds)
-                        if voice_speed >= 0.8:
-                            audio = audio.speedup(playback_speed=voice_speed)
-
-                    # Export adjusted audio
-                    audio.export(audio_path, format="mp3")
-                    duration = len(audio) / 1000.0  # Duration in seconds
-                else:
-                    # No speed adjustment needed, just copy the file
-                    audio = AudioSegment.from_mp3(temp_audio_path)
-                    audio.export(audio_path, format="mp3")
-                    duration = len(audio) / 1000.0
-
-            finally:
-                # Clean up temporary file
-                if os.path.exists(temp_audio_path):
-                    os.unlink(temp_audio_path)
+                text = self.recognizer.recognize_sphinx(audio)
+                confidence = 0.7  # Lower confidence for offline recognition
+            except sr.RequestError:
+                raise Exception("Speech recognition service unavailable")
 
-            # Return relative path for API response
-            relative_path = f"/api/v1/audio/{audio_filename}"
+        return text, confidence
 
-            logger.info(f"Text to speech conversion successful: {relative_path}")
-            return relative_path, duration
+    def _adjust_for_ambient_noise(self, source: sr.AudioFile, duration: float):
+        """
+        Set the recognizer energy threshold from the noise floor at the start of the audio
+
+        Vectorized replacement for Recognizer.adjust_for_ambient_noise: it
+        consumes the same number of frames, so the recording that follows is
+        unchanged, but computes the RMS energy with NumPy in one pass.
+
+        Args:
+            source: Open audio source
+            duration: Maximum calibration time in seconds
+        """
+        chunks = int(duration * source.SAMPLE_RATE / source.CHUNK)
+        buffer = source.stream.read(chunks * source.CHUNK)
+        if not buffer:
+            return
+
+        samples = _pcm_samples(buffer, source.SAMPLE_WIDTH)
+        energy = np.sqrt(np.mean(np.square(samples, dtype=np.float64)))
+        self.recognizer.energy_threshold = float(energy * self.recognizer.dynamic_energy_ratio)
+
+    @staticmethod
+    def _cached_duration(audio_path: str) -> Optional[float]:
+        """
+        Get the duration of an already generated audio file and mark it as used
+
+        Args:
+            audio_path: Path of the MP3 file
+
+        Returns:
+            Duration in seconds, or None if the file does not exist
+        """
+        # Touching the file keeps prune_audio_files from deleting audio that is
+        # still in use; opening it ourselves turns a concurrent prune into a
+        # plain cache miss, where mutagen would wrap the FileNotFoundError
+        try:
+            os.utime(audio_path)
+            with open(audio_path, "rb") as audio_file:
+                return MP3(audio_file).info.length
+        except FileNotFoundError:
+            return None
+
+    def _create_tts(self, text: str, language: str, voice_speed: float) -> gTTS:
+        """
+        Create the gTTS object for a synthesis request
+
+        Args:
+            text: Text to convert to speech
+            language: Language code for speech synthesis
+            voice_speed: Speed multiplier for speech
+
+        Returns:
+            gTTS object, not yet synthesized
+        """
+        # gTTS only tokenizes on save, where it drops tokens that are all
+        # punctuation and whitespace; reject such text before the request returns
+        if not text.strip(_UNSPEAKABLE_CHARS):
+            raise Exception("No text to send to TTS API")
+
+        # Convert language code to format expected by gTTS
+        tts_language = self._get_tts_language_code(language)
+
+        # Create gTTS object
+        return gTTS(
+            text=text,
+            lang=tts_language,
+            slow=(voice_speed < 0.8)  # Use slow speech for speeds below 0.8
+        )
+
+    def _synthesize_blocking(self, tts: gTTS, voice_speed: float, audio_path: str) -> float:
+        """
+        Synthesize speech to an MP3 file, blocking until done
+
+        Args:
+            tts: gTTS object to synthesize
+            voice_speed: Speed multiplier for speech
+            audio_path: Path of the MP3 file to write
 
+        Returns:
+            Duration in seconds
+        """
+        # Write under a temporary name and rename, so a concurrent request for
+        # the same audio never serves a partially written file
+        partial_path = os.path.join(
+            os.path.dirname(audio_path),
+            f".{uuid.uuid4().hex}.{os.path.basename(audio_path)}"
+        )
+
+        try:
+            # gTTS output is already MP3; only a speed change needs a decode and
+            # re-encode (speeds below 0.8 are covered by gTTS slow mode alone)
+            if voice_speed == 1.0 or voice_speed < 0.8:
+                tts.save(partial_path)
+            else:
+                # Keep the synthesized speech in memory instead of a temporary file
+                tts_buffer = io.BytesIO()
+                tts.write_to_fp(tts_buffer)
+
+                # Adjust speed with one native ffmpeg pass
+                self._change_speed(tts_buffer.getvalue(), partial_path, voice_speed)
+
+            duration = MP3(partial_path).info.length  # Read from the MP3 header
+            os.replace(partial_path, audio_path)
+
+        finally:
+            if os.path.exists(partial_path):
+                os.unlink(partial_path)
+
+        return duration
+
+    def prune_audio_files(self, max_age_seconds: float) -> int:
+        """
+        Delete generated audio files that have not been used for the given time
+
+        Cache hits in text_to_speech refresh a file's modification time, so
+        this evicts the least recently used files.
+
+        Args:
+            max_age_seconds: Maximum time since last use in seconds
+
+        Returns:
+            Number of files deleted
+        """
+        cutoff = time.time() - max_age_seconds
+        removed = 0
+        with os.scandir(self.audio_output_dir) as entries:
+            for entry in entries:
+                if not entry.name.endswith(".mp3"):
+                    continue
+                try:
+                    if entry.stat().st_mtime < cutoff:
+                        os.unlink(entry.path)
+                        removed += 1
+                except FileNotFoundError:
+                    pass  # Removed concurrently
+        return removed
+
+    def warmup(self):
+        """
+        Prime the external binaries used on the speech paths
+
+        Runs the FLAC encoder used for recognition uploads and ffmpeg once, and
+        does a tiny pydub WAV export, so the first request does not pay for
+        locating, marking executable and loading them. Failures are logged and
+        otherwise ignored; the request path reports them properly.
+        """
+        try:
+            flac_converter = sr.get_flac_converter()
+            subprocess.run([flac_converter, "--version"], capture_output=True, check=True)
+            subprocess.run([AudioSegment.converter, "-version"], capture_output=True, check=True)
+            AudioSegment.silent(duration=100).export(io.BytesIO(), format="wav")
         except Exception as e:
-            logger.error(f"Text to speech conversion failed: {str(e)}")
-            raise Exception(f"Text to speech conversion failed: {str(e)}")
+            logger.warning("Speech service warmup failed: %s", e)
+
+    def close(self):
+        """Stop recognition batching and close the pooled HTTP connections and the worker pool"""
+        self._stt_batcher.close()
+        if self._http is not None:
+            self._http.close()
+            self._http = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def _recognize_google(self, audio: sr.AudioData, language: str) -> str:
+        """
+        Recognize speech with the Google Speech Recognition API
+
+        Same request and response handling as Recognizer.recognize_google, but
+        sent through the shared HTTP client so connections are reused.
+
+        Args:
+            audio: Recorded audio
+            language: Language code for recognition
+
+        Returns:
+            Most likely transcription
+        """
+        flac_data = audio.get_flac_data(
+            convert_rate=None if audio.sample_rate >= 8000 else 8000,  # audio samples must be at least 8 kHz
+            convert_width=2  # audio samples must be 16-bit
+        )
 
-    def _get_recognition_language_code(self, language: str) -> str:
+        try:
+            response = self._http.post(
+                GOOGLE_SPEECH_URL,
+                params={"client": "chromium", "lang": language, "key": settings.google_speech_api_key, "pFilter": 0},
+                content=flac_data,
+                headers={"Content-Type": f"audio/x-flac; rate={audio.sample_rate}"}
+            )
+            response.raise_for_status()
+        except httpx.HTTPStatusError as e:
+            raise sr.RequestError(f"recognition request failed: {e.response.reason_phrase}")
+        except httpx.HTTPError as e:
+            raise sr.RequestError(f"recognition connection failed: {e}")
+
+        # The response is one JSON object per line; skip the blank results
+        for line in response.text.split("\n"):
+            if not line:
+                continue
+            result = json.loads(line)["result"]
+            if result:
+                alternatives = result[0].get("alternative", [])
+                if alternatives and "transcript" in alternatives[0]:
+                    return alternatives[0]["transcript"]
+                break
+
+        raise sr.UnknownValueError()
+
+    def _change_speed(self, mp3_bytes: bytes, output_path: str, speed: float):
+        """
+        Change the tempo of MP3 audio without changing its pitch
+
+        Args:
+            mp3_bytes: Source MP3 content
+            output_path: Path of the MP3 file to write
+            speed: Speed multiplier
+        """
+        command = [
+            AudioSegment.converter, "-y", "-hide_banner", "-loglevel", "error",
+            "-f", "mp3", "-i", "pipe:0",
+            "-filter:a", _atempo_filter(speed),
+            # Let ffmpeg pick the thread count for the encoder
+            "-threads", "0",
+            "-c:a", "libmp3lame", "-f", "mp3",
+            output_path
+        ]
+        result = subprocess.run(command, input=mp3_bytes, capture_output=True)
+        if result.returncode != 0:
+            raise Exception(f"ffmpeg speed adjustment failed: {result.stderr.decode(errors='replace').strip()}")
+
+    @staticmethod
+    def _get_recognition_language_code(language: str) -> str:
         """
         Convert language code to format expected by speech recognition
 
@@ -226,34 +798,10 @@ class SpeechService:
         Returns:
             Language code for speech recognition
         """
-        # Mapping for speech recognition language codes
-        recognition_mapping = {
-            "en": "en-US",
-            "hi": "hi-IN",
-            "kn": "kn-IN",
-            "ta": "ta-IN",
-            "te": "te-IN",
-            "ml": "ml-IN",
-            "bn": "bn-IN",
-            "gu": "gu-IN",
-            "mr": "mr-IN",
-            "pa": "pa-IN",
-            "ur": "ur-PK",
-            "es": "es-ES",
-            "fr": "fr-FR",
-            "de": "de-DE",
-            "it": "it-IT",
-            "pt": "pt-PT",
-            "ru": "ru-RU",
-            "ja": "ja-JP",
-            "ko": "ko-KR",
-            "zh": "zh-CN",
-            "ar": "ar-SA"
-        }
-
-        return recognition_mapping.get(language, "en-US")
-
-    def _get_tts_language_code(self, language: str) -> str:
+        return _RECOGNITION_LANGUAGE_CODES.get(language, "en-US")
+
+    @staticmethod
+    def _get_tts_language_code(language: str) -> str:
         """
         Convert language code to format expected by gTTS
 
@@ -263,22 +811,7 @@ class SpeechService:
         Returns:
             Language code for text-to-speech
         """
-        # gTTS uses standard ISO 639-1 codes for most languages
-        # Some adjustments for specific languages
-        tts_mapping = {
-            "kn": "kn",  # Kannada
-            "ta": "ta",  # Tamil
-            "te": "te",  # Telugu
-            "ml": "ml",  # Malayalam
-            "bn": "bn",  # Bengali
-            "gu": "gu",  # Gujarati
-            "mr": "mr",  # Marathi
-            "pa": "pa",  # Punjabi
-            "ur": "ur",  # Urdu
-            "zh": "zh-cn"  # Chinese (Simplified)
-        }
-
-        return tts_mapping.get(language, language)
+        return _TTS_LANGUAGE_CODES.get(language, language)
 
 
 # Global service instance
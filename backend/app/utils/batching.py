@@ -0,0 +1,187 @@
+"""
+Helpers for coalescing concurrent requests into batches
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, List, Optional
+
+
+class LoopBinding:
+    """
+    Track the event loop that owns a service's asyncio state
+
+    The services are process-wide singletons, but asyncio queues, tasks and
+    semaphores only work on the loop that created them. A later loop in the
+    same process (e.g. TestClient, which starts one per request) has to
+    recreate that state instead of waiting on the old loop's tasks.
+    """
+
+    def __init__(self):
+        """Initialize without a loop; the first rebind() records one"""
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def rebind(self) -> bool:
+        """
+        Record the running event loop
+
+        Returns:
+            True if it differs from the recorded loop, so loop-bound state
+            must be recreated
+        """
+        loop = asyncio.get_running_loop()
+        if loop is self.loop:
+            return False
+
+        self.loop = loop
+        return True
+
+    def reset(self):
+        """Forget the recorded loop, so the next rebind() reports a change"""
+        self.loop = None
+
+
+class MicroBatcher:
+    """
+    Collect items submitted within a short window and process them together
+
+    The first submitted item opens a window; items arriving before it closes
+    are dispatched in the same batch, up to a maximum count and, optionally,
+    a maximum combined weight. Each batch runs in its own task so the next
+    window can fill meanwhile.
+    """
+
+    def __init__(
+        self,
+        process_batch: Callable[[List[Any]], Awaitable[List[Any]]],
+        window_seconds: float,
+        max_batch_size: int,
+        max_batch_weight: Optional[int] = None,
+        weight: Optional[Callable[[Any], int]] = None
+    ):
+        """
+        Initialize the batcher; the queue and worker start on first submit
+
+        Args:
+            process_batch: Coroutine function returning one result per item, in
+                order. A result that is an exception is raised to that item's
+                caller; if the call itself raises, every item in the batch fails.
+            window_seconds: Time to wait for more items after the first one
+            max_batch_size: Maximum number of items per batch
+            max_batch_weight: Maximum combined weight of a batch, if any
+            weight: Weight of an item, used with max_batch_weight
+        """
+        self._process_batch = process_batch
+        self._window_seconds = window_seconds
+        self._max_batch_size = max_batch_size
+        self._max_batch_weight = max_batch_weight
+        self._weight = weight or (lambda item: 0)
+
+        self._loop_binding = LoopBinding()
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._batch_tasks = set()
+
+    async def submit(self, item: Any) -> Any:
+        """
+        Queue an item and wait for its result
+
+        Args:
+            item: Item to process
+
+        Returns:
+            Result of the item from process_batch
+        """
+        if self._loop_binding.rebind():
+            # Any queue and worker left over belong to an earlier loop
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._collect_batches(self._queue))
+            self._batch_tasks = set()
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((item, future))
+        return await future
+
+    async def _collect_batches(self, queue: asyncio.Queue):
+        """
+        Collect queued items and dispatch them in batches
+
+        Args:
+            queue: Queue of (item, future) pairs
+        """
+        loop = asyncio.get_running_loop()
+        # Entry that did not fit in the previous batch; it starts the next one
+        carried = None
+        while True:
+            batch = [carried if carried is not None else await queue.get()]
+            carried = None
+            batch_weight = self._weight(batch[0][0])
+            deadline = loop.time() + self._window_seconds
+
+            while len(batch) < self._max_batch_size:
+                if self._max_batch_weight is not None and batch_weight >= self._max_batch_weight:
+                    break
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    entry = await asyncio.wait_for(queue.get(), timeout=remaining)
+                except asyncio.TimeoutError:
+                    break
+
+                entry_weight = self._weight(entry[0])
+                if self._max_batch_weight is not None and batch_weight + entry_weight > self._max_batch_weight:
+                    carried = entry
+                    break
+                batch.append(entry)
+                batch_weight += entry_weight
+
+            task = asyncio.create_task(self._dispatch(batch))
+            self._batch_tasks.add(task)
+            task.add_done_callback(self._batch_tasks.discard)
+
+    async def _dispatch(self, batch: List[tuple]):
+        """
+        Process a batch and resolve the waiting futures
+
+        Args:
+            batch: List of (item, future) pairs
+        """
+        try:
+            results = await self._process_batch([item for item, _ in batch])
+        except Exception as e:
+            results = [e] * len(batch)
+
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    def close(self) -> List[asyncio.Task]:
+        """
+        Cancel the worker and the batches in flight
+
+        Returns:
+            The cancelled tasks, for callers that want to await them
+        """
+        tasks = [task for task in [self._worker, *self._batch_tasks] if task is not None]
+        loop = self._loop_binding.loop
+
+        # Tasks of a loop that has already been closed cannot be cancelled
+        if loop is None or loop.is_closed():
+            tasks = []
+        for task in tasks:
+            task.cancel()
+
+        self._loop_binding.reset()
+        self._queue = None
+        self._worker = None
+        self._batch_tasks = set()
+        return tasks
+
+    async def aclose(self):
+        """Cancel the worker and the batches in flight, and wait for them to finish"""
+        running_loop = asyncio.get_running_loop()
+        tasks = [task for task in self.close() if task.get_loop() is running_loop]
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -12,7 +12,9 @@ def setup_logging():
     # Create formatter
     formatter = logging.Formatter(
         fmt="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-        datefmt="%Y-%m-%d %H:%M:%S"
+        datefmt="%Y-%m-%d %H:%M:%S",
+        style="%",
+        validate=False
     )
     
     # Create console handler
@@ -1,16 +1,40 @@
 """
 Main FastAPI application entry point
 """
+import asyncio
 import logging
 import os
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from app.config import settings
 from app.api.routes import router
+from app.services.gemini_service import close_gemini_service
+from app.services.speech_service import speech_service
 from app.utils.logging import setup_logging
 
+# How often expired generated audio files are cleaned up
+AUDIO_PRUNE_INTERVAL_SECONDS = 3600
+
+# CORS origins from the comma-separated setting, parsed once
+ALLOWED_ORIGINS = [origin.strip() for origin in settings.allowed_origins.split(",") if origin.strip()]
+
+
+async def prune_audio_cache():
+    """Periodically delete generated audio files that have not been used recently"""
+    logger = logging.getLogger(__name__)
+    max_age_seconds = settings.audio_cache_max_age_days * 86400
+    while True:
+        try:
+            removed = await asyncio.to_thread(speech_service.prune_audio_files, max_age_seconds)
+            if removed:
+                logger.info("Pruned %d expired audio files", removed)
+        except Exception as e:
+            logger.error("Audio cache pruning failed: %s", e)
+        await asyncio.sleep(AUDIO_PRUNE_INTERVAL_SECONDS)
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -19,13 +43,18 @@ async def lifespan(app: FastAPI):
     logger = setup_logging()
     logger.info("Starting Multilingual Voice Translation API")
 
-    # Create static directories
-    os.makedirs("app/static/audio", exist_ok=True)
+    # Load the FLAC and ffmpeg binaries before the first request needs them
+    await asyncio.to_thread(speech_service.warmup)
+
+    prune_task = asyncio.create_task(prune_audio_cache())
 
     yield
 
     # Shutdown
     logger.info("Shutting down Multilingual Voice Translation API")
+    prune_task.cancel()
+    await close_gemini_service()
+    speech_service.close()
 
 
 # Create FastAPI application
@@ -33,18 +62,22 @@ app = FastAPI(
     title=settings.app_name,
     version=settings.version,
     description="A multilingual voice-based news translation application",
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=settings.allowed_origins.split(","),
+    allow_origins=ALLOWED_ORIGINS,
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST", "OPTIONS"],
+    allow_headers=["content-type", "authorization"],
 )
 
+# Create static directories; StaticFiles requires them to exist when mounted
+os.makedirs(speech_service.audio_output_dir, exist_ok=True)
+
 # Mount static files
 app.mount("/static", StaticFiles(directory="app/static"), name="static")
 
@@ -54,6 +54,49 @@ def test_translation():
         print(f"Translation test failed: {e}")
         return False
 
+def test_multi_translation():
+    """Test multi-target translation endpoint"""
+    try:
+        data = {
+            "text": "Hello, how are you today?",
+            "source_language": "en",
+            "target_languages": ["hi", "kn", "ta"]
+        }
+        response = requests.post(f"{BASE_URL}/translate-multi", json=data)
+        print(f"Multi Translation: {response.status_code}")
+        if response.status_code == 200:
+            result = response.json()
+            print(f"Original: {result['original_text']}")
+            for language, translation in result['translations'].items():
+                print(f"  {language}: {translation}")
+        else:
+            print(f"Error: {response.text}")
+        return response.status_code == 200
+    except Exception as e:
+        print(f"Multi translation test failed: {e}")
+        return False
+
+def test_auto_translation():
+    """Test auto translation endpoint"""
+    try:
+        data = {
+            "text": "Hello, how are you today?",
+            "target_language": "hi"
+        }
+        response = requests.post(f"{BASE_URL}/auto-translate", json=data)
+        print(f"Auto Translation: {response.status_code}")
+        if response.status_code == 200:
+            result = response.json()
+            print(f"Original: {result['original_text']}")
+            print(f"Detected Language: {result['source_language']}")
+            print(f"Translated: {result['translated_text']}")
+        else:
+            print(f"Error: {response.text}")
+        return response.status_code == 200
+    except Exception as e:
+        print(f"Auto translation test failed: {e}")
+        return False
+
 def test_language_detection():
     """Test language detection endpoint"""
     try:
@@ -72,6 +115,28 @@ def test_language_detection():
         print(f"Language detection test failed: {e}")
         return False
 
+def test_repeated_event_loops():
+    """Test that Gemini calls keep working when each request runs on a new event loop"""
+    try:
+        from fastapi.testclient import TestClient
+        from main import app
+
+        # Outside a `with` block TestClient runs every request on a fresh event loop
+        client = TestClient(app)
+        texts = ["Good morning", "The weather is nice today", "See you tomorrow"]
+        statuses = []
+        for text in texts:
+            data = {"text": text, "source_language": "en", "target_language": "hi"}
+            response = client.post("/api/v1/translate", json=data)
+            print(f"In-process Translation: {response.status_code}")
+            if response.status_code != 200:
+                print(f"Error: {response.text}")
+            statuses.append(response.status_code)
+        return all(status_code == 200 for status_code in statuses)
+    except Exception as e:
+        print(f"Repeated event loop test failed: {e}")
+        return False
+
 def main():
     """Run all tests"""
     print("Testing Multilingual Voice Translation API")
@@ -81,7 +146,10 @@ def main():
         ("Health Check", test_health),
         ("Languages", test_languages),
         ("Translation", test_translation),
+        ("Multi Translation", test_multi_translation),
+        ("Auto Translation", test_auto_translation),
         ("Language Detection", test_language_detection),
+        ("Repeated Event Loops", test_repeated_event_loops),
     ]
     
     results = []
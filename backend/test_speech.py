@@ -2,6 +2,8 @@
 """
 Test script for speech-to-text functionality
 """
+import io
+import wave
 import requests
 import json
 
@@ -38,6 +40,36 @@ def test_speech_to_text():
     except Exception as e:
         print(f"❌ Connection error: {e}")
 
+def test_speech_to_text_sample_widths():
+    """Test that PCM WAV uploads of every sample width are decoded"""
+
+    url = "http://192.168.116.67:8000/api/v1/speech-to-text"
+
+    for sample_width in (1, 2, 3, 4):
+        # One second of silence; recognition may find no speech, but decoding must succeed
+        wav_buffer = io.BytesIO()
+        with wave.open(wav_buffer, "wb") as wav_file:
+            wav_file.setnchannels(1)
+            wav_file.setsampwidth(sample_width)
+            wav_file.setframerate(16000)
+            wav_file.writeframes(b"\x00" * sample_width * 16000)
+
+        files = {
+            'audio': ('test.wav', wav_buffer.getvalue(), 'audio/wav')
+        }
+
+        try:
+            response = requests.post(url, files=files, data={'language': 'en'})
+            detail = response.json().get('detail', '') if response.status_code != 200 else ''
+
+            if response.status_code == 200 or "Could not understand the audio" in detail:
+                print(f"✅ {sample_width * 8}-bit WAV decoded")
+            else:
+                print(f"❌ {sample_width * 8}-bit WAV failed: {response.status_code} {detail}")
+
+        except Exception as e:
+            print(f"❌ Connection error: {e}")
+
 def test_health():
     """Test the health endpoint"""
     try:
@@ -57,5 +89,8 @@ if __name__ == "__main__":
     
     print("\n2. Testing Speech-to-Text Endpoint:")
     test_speech_to_text()
+
+    print("\n3. Testing WAV Sample Widths:")
+    test_speech_to_text_sample_widths()
     
     print("\n✅ Test completed!")